@@ -9,8 +9,9 @@ with proper pauses between speakers for a natural conversation flow.
 import os
 import sys
 import argparse
-import glob
+import subprocess
 from pathlib import Path
+import segments
 
 
 def combine_podcast_segments(segments_dir, output_file, pause_duration=1.0):
@@ -26,8 +27,8 @@ def combine_podcast_segments(segments_dir, output_file, pause_duration=1.0):
         bool: True if successful, False otherwise
     """
     try:
-        # Get all MP3 files in the segments directory, sorted by name
-        segment_files = sorted(glob.glob(os.path.join(segments_dir, "*.mp3")))
+        # Get all MP3 files in the segments directory, in segment order
+        segment_files = segments.list_segments(segments_dir, ".mp3")
         
         if not segment_files:
             print(f"No MP3 files found in {segments_dir}")
@@ -36,37 +37,41 @@ def combine_podcast_segments(segments_dir, output_file, pause_duration=1.0):
         print(f"Found {len(segment_files)} audio segments")
         print("Combining segments into single podcast...")
         
-        # Create the ffmpeg command to concatenate all files
-        # First, create a file list for ffmpeg
-        file_list_path = "temp_file_list.txt"
+        # Build a single filter graph: pad every segment but the last with
+        # silence, then join them all in one decoding/encoding pass
+        input_args = []
+        filters = []
+        for index, segment_file in enumerate(segment_files):
+            input_args.extend(['-i', segment_file])
+            if index < len(segment_files) - 1:
+                filters.append(f"[{index}:a]apad=pad_dur={pause_duration}[a{index}]")
+            else:
+                filters.append(f"[{index}:a]anull[a{index}]")
         
-        with open(file_list_path, 'w') as f:
-            for segment_file in segment_files:
-                f.write(f"file '{os.path.abspath(segment_file)}'\n")
-                # Add a pause after each segment (except the last one)
-                if segment_file != segment_files[-1]:
-                    # Create a silent audio segment for the pause
-                    silence_file = f"temp_silence_{len(segment_files)}.mp3"
-                    silence_cmd = f"ffmpeg -f lavfi -i anullsrc=channel_layout=stereo:sample_rate=44100 -t {pause_duration} -q:a 9 -acodec libmp3lame {silence_file} -y"
-                    os.system(silence_cmd)
-                    f.write(f"file '{os.path.abspath(silence_file)}'\n")
+        concat_inputs = "".join(f"[a{index}]" for index in range(len(segment_files)))
+        filters.append(f"{concat_inputs}concat=n={len(segment_files)}:v=0:a=1[out]")
+        filter_complex = ";".join(filters)
         
-        # Use ffmpeg to concatenate all files
-        ffmpeg_cmd = f"ffmpeg -f concat -safe 0 -i {file_list_path} -c copy {output_file} -y"
+        ffmpeg_cmd = [
+            'ffmpeg',
+            *input_args,
+            '-filter_complex', filter_complex,
+            '-map', '[out]',
+            '-threads', '0',
+            '-c:a', 'libmp3lame',
+            '-b:a', '192k',
+            output_file,
+            '-y'
+        ]
         
         print("Running ffmpeg to combine segments...")
-        result = os.system(ffmpeg_cmd)
+        result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True)
         
-        # Clean up temporary files
-        os.remove(file_list_path)
-        for silence_file in glob.glob("temp_silence_*.mp3"):
-            os.remove(silence_file)
-        
-        if result == 0:
+        if result.returncode == 0:
             print(f"✓ Podcast successfully combined: {output_file}")
             return True
         else:
-            print("✗ Error combining podcast segments")
+            print(f"✗ Error combining podcast segments: {result.stderr}")
             return False
             
     except Exception as e:
@@ -112,6 +117,12 @@ Examples:
     
     args = parser.parse_args()
     
+    # Check if ffmpeg is available
+    if not segments.check_ffmpeg():
+        print("Error: ffmpeg is not installed or not available in PATH", file=sys.stderr)
+        print("Please install ffmpeg: https://ffmpeg.org/download.html", file=sys.stderr)
+        sys.exit(1)
+    
     try:
         if not os.path.exists(args.segments_dir):
             print(f"Error: Segments directory not found: {args.segments_dir}")
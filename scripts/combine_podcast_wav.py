@@ -9,26 +9,231 @@ using ffmpeg directly, specifically for Coqui TTS output.
 import os
 import sys
 import argparse
-import glob
 import subprocess
 import tempfile
+import wave
+from concurrent.futures import ThreadPoolExecutor
+import segments
 
 
-def combine_audio_segments(input_dir, output_file):
+def read_wav_params(audio_file):
+    """
+    Read the stream parameters from a WAV header without decoding audio.
+    
+    Args:
+        audio_file (str): Path to the WAV file
+        
+    Returns:
+        tuple: (sample_rate, channels, sample_width), or None if unreadable
+    """
+    try:
+        with wave.open(audio_file, 'rb') as wav_file:
+            return (wav_file.getframerate(), wav_file.getnchannels(), wav_file.getsampwidth())
+    except (wave.Error, EOFError):
+        return None
+
+
+# The concat list is fed to ffmpeg on stdin rather than through a temp file
+CONCAT_STDIN_ARGS = [
+    '-f', 'concat',
+    '-safe', '0',
+    '-protocol_whitelist', 'file,pipe',
+    '-i', 'pipe:0'
+]
+
+
+def format_concat_list(files):
+    """
+    Build the text of an ffmpeg concat list.
+    
+    Args:
+        files (list): Paths to join, in order
+        
+    Returns:
+        str: One ``file 'file:...'`` line per path
+    """
+    lines = []
+    for path in files:
+        # Single quotes are closed, escaped, and reopened inside a quoted path
+        quoted = os.path.abspath(path).replace("'", "'\\''")
+        # Without an explicit protocol ffmpeg resolves entries against the
+        # list's own pipe: URL
+        lines.append(f"file 'file:{quoted}'\n")
+    return "".join(lines)
+
+
+def build_concat_command(audio_files, output_file):
+    """
+    Build the ffmpeg command that joins the segments into one MP3.
+    
+    Homogeneous inputs go through the concat demuxer, which reads the PCM
+    back to back and encodes it once; the file list is expected on stdin.
+    Mixed sample rates or channel layouts cannot be joined that way, so they
+    fall back to the concat filter, which converts every input to a common
+    format first and ignores stdin.
+    
+    Args:
+        audio_files (list): Sorted list of WAV segment paths
+        output_file (str): Output file path
+        
+    Returns:
+        list: ffmpeg command arguments
+    """
+    params = {read_wav_params(audio_file) for audio_file in audio_files}
+    
+    if len(params) == 1 and None not in params:
+        input_args = list(CONCAT_STDIN_ARGS)
+    else:
+        print("Segments have mixed audio formats, resampling while combining...")
+        input_args = ['-nostdin']
+        for audio_file in audio_files:
+            input_args.extend(['-i', audio_file])
+        concat_inputs = "".join(f"[{index}:a]" for index in range(len(audio_files)))
+        input_args.extend([
+            '-filter_complex', f"{concat_inputs}concat=n={len(audio_files)}:v=0:a=1[out]",
+            '-map', '[out]'
+        ])
+    
+    return [
+        'ffmpeg',
+        *input_args,
+        '-threads', '0',
+        '-c:a', 'libmp3lame',
+        '-b:a', '192k',
+        output_file,
+        '-y'  # Overwrite output file if it exists
+    ]
+
+
+def encode_segment(audio_file, mp3_file, wav_params=None):
+    """
+    Encode a single WAV segment to MP3.
+    
+    Args:
+        audio_file (str): Path to the WAV segment
+        mp3_file (str): Path for the encoded MP3
+        wav_params (tuple): (sample_rate, channels, sample_width) to convert to
+        
+    Returns:
+        str: Path to the encoded MP3
+    """
+    cmd = ['ffmpeg', '-i', audio_file]
+    if wav_params is not None:
+        cmd.extend(['-ar', str(wav_params[0]), '-ac', str(wav_params[1])])
+    cmd.extend([
+        '-c:a', 'libmp3lame',
+        '-b:a', '192k',
+        '-threads', '1',
+        mp3_file,
+        '-y'
+    ])
+    subprocess.run(cmd, capture_output=True, check=True)
+    return mp3_file
+
+
+def encode_segments(audio_files, work_dir, jobs):
+    """
+    Encode WAV segments to MP3 in parallel.
+    
+    libmp3lame encodes a stream on a single core, but the segments are
+    independent, so running one ffmpeg per segment keeps every core busy.
+    All segments are converted to the format of the first one so the
+    results can be joined without re-encoding.
+    
+    Args:
+        audio_files (list): Sorted list of WAV segment paths
+        work_dir (str): Directory for the encoded MP3 files
+        jobs (int): Number of ffmpeg processes to run at once
+        
+    Returns:
+        list: Paths to the encoded MP3 files, in input order
+    """
+    wav_params = read_wav_params(audio_files[0])
+    mp3_files = [
+        os.path.join(work_dir, f"{index:05d}.mp3")
+        for index in range(len(audio_files))
+    ]
+    
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(
+            encode_segment,
+            audio_files,
+            mp3_files,
+            [wav_params] * len(audio_files)
+        ))
+
+
+def combine_pcm_segments(audio_files, output_file):
+    """
+    Join WAV segments in memory and write a WAV or FLAC file directly.
+    
+    Uncompressed output needs no encoder, so the samples are read with
+    soundfile, concatenated with numpy, and written in one go without
+    starting ffmpeg at all.
+    
+    Args:
+        audio_files (list): Sorted list of WAV segment paths
+        output_file (str): Output .wav or .flac path
+        
+    Returns:
+        float: Duration of the written file in seconds, or None if the
+            segments cannot be joined this way and ffmpeg should be used
+    """
+    try:
+        import numpy as np
+        import soundfile as sf
+    except ImportError:
+        return None
+    
+    try:
+        infos = [sf.info(audio_file) for audio_file in audio_files]
+    except (RuntimeError, OSError):
+        # Let ffmpeg deal with segments soundfile can't read
+        return None
+    
+    # Mixed formats need resampling or conversion, which ffmpeg does
+    if len({(info.samplerate, info.channels, info.subtype) for info in infos}) != 1:
+        return None
+    
+    # FLAC has no float or 32-bit subtypes; ffmpeg converts those
+    subtype = infos[0].subtype
+    output_format = os.path.splitext(output_file)[1][1:].upper()
+    if not sf.check_format(output_format, subtype):
+        return None
+    
+    # Read in a type that holds every sample exactly (float32 covers 8- and
+    # 24-bit PCM), then write back in the segments' own subtype
+    dtype = {'PCM_16': 'int16', 'PCM_32': 'int32', 'DOUBLE': 'float64'}.get(subtype, 'float32')
+    
+    def read_segment(audio_file):
+        data, _ = sf.read(audio_file, dtype=dtype, always_2d=True)
+        return data
+    
+    # Reading is I/O bound, so overlap the file reads
+    with ThreadPoolExecutor() as executor:
+        arrays = list(executor.map(read_segment, audio_files))
+    
+    combined = np.concatenate(arrays)
+    sf.write(output_file, combined, infos[0].samplerate, subtype=subtype)
+    return len(combined) / infos[0].samplerate
+
+
+def combine_audio_segments(input_dir, output_file, jobs=1):
     """
     Combine audio segments into a single podcast file using ffmpeg.
     
     Args:
         input_dir (str): Directory containing audio segments
         output_file (str): Output file path
+        jobs (int): Parallel encoders; above 1 the segments are encoded
+            separately and joined with a stream copy
         
     Returns:
         bool: True if successful, False otherwise
     """
     try:
-        # Get all WAV files in the directory, sorted by name
-        audio_files = glob.glob(os.path.join(input_dir, "*.wav"))
-        audio_files.sort()
+        # Get all WAV files in the directory, in segment order
+        audio_files = segments.list_segments(input_dir, ".wav")
         
         if not audio_files:
             print("No WAV files found in", input_dir)
@@ -37,27 +242,43 @@ def combine_audio_segments(input_dir, output_file):
         print(f"Found {len(audio_files)} audio segments")
         print("Combining segments...")
         
-        # Create a temporary file with the list of audio files
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False) as f:
-            for audio_file in audio_files:
-                f.write(f"file '{os.path.abspath(audio_file)}'\n")
-            file_list_path = f.name
+        if os.path.splitext(output_file)[1].lower() in ('.wav', '.flac'):
+            duration = combine_pcm_segments(audio_files, output_file)
+            if duration is not None:
+                print(f"✓ Successfully created: {output_file}")
+                print(f"Total duration: {duration:.2f} seconds")
+                return True
+        
+        # Only the encode and concat path needs ffmpeg; WAV and FLAC output
+        # is written directly when soundfile can join the segments
+        if not segments.check_ffmpeg():
+            print("Error: ffmpeg is not installed or not available in PATH")
+            print("Please install ffmpeg: https://ffmpeg.org/download.html")
+            return False
         
-        try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            if jobs > 1:
+                print(f"Encoding segments with {jobs} parallel workers...")
+                concat_files = encode_segments(audio_files, work_dir, jobs)
+            else:
+                concat_files = audio_files
+            
+            file_list = format_concat_list(concat_files)
+            
             # Use ffmpeg to concatenate the audio files
-            cmd = [
-                'ffmpeg',
-                '-f', 'concat',
-                '-safe', '0',
-                '-i', file_list_path,
-                '-c:a', 'libmp3lame',
-                '-b:a', '192k',
-                output_file,
-                '-y'  # Overwrite output file if it exists
-            ]
+            if jobs > 1:
+                cmd = [
+                    'ffmpeg',
+                    *CONCAT_STDIN_ARGS,
+                    '-c', 'copy',
+                    output_file,
+                    '-y'
+                ]
+            else:
+                cmd = build_concat_command(audio_files, output_file)
             
             print("Running ffmpeg command...")
-            result = subprocess.run(cmd, capture_output=True, text=True)
+            result = subprocess.run(cmd, input=file_list, capture_output=True, text=True)
             
             if result.returncode == 0:
                 print(f"✓ Successfully created: {output_file}")
@@ -80,25 +301,12 @@ def combine_audio_segments(input_dir, output_file):
             else:
                 print(f"Error running ffmpeg: {result.stderr}")
                 return False
-                
-        finally:
-            # Clean up temporary file
-            os.unlink(file_list_path)
         
     except Exception as e:
         print(f"Error combining audio segments: {e}")
         return False
 
 
-def check_ffmpeg():
-    """Check if ffmpeg is available on the system."""
-    try:
-        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
-        return result.returncode == 0
-    except FileNotFoundError:
-        return False
-
-
 def main():
     """Main function to handle command line arguments and run audio combination."""
     parser = argparse.ArgumentParser(
@@ -108,6 +316,7 @@ def main():
 Examples:
   python combine_podcast_wav.py coqui_podcast_segments -o coqui_podcast.mp3
   python combine_podcast_wav.py podcast_segments -o final_podcast.mp3
+  python combine_podcast_wav.py podcast_segments -o final_podcast.flac
         """
     )
     
@@ -122,6 +331,14 @@ Examples:
         help="Output file path (default: combined_podcast.mp3)"
     )
     
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        help="Encode segments with N parallel ffmpeg processes, then join them "
+             "without re-encoding (0 = one per CPU; default: 1, single encode pass)"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -130,27 +347,23 @@ Examples:
     
     args = parser.parse_args()
     
-    # Check if ffmpeg is available
-    if not check_ffmpeg():
-        print("Error: ffmpeg is not installed or not available in PATH", file=sys.stderr)
-        print("Please install ffmpeg: https://ffmpeg.org/download.html", file=sys.stderr)
-        sys.exit(1)
-    
     # Check if input directory exists
     if not os.path.isdir(args.input_dir):
         print(f"Error: Input directory '{args.input_dir}' does not exist", file=sys.stderr)
         sys.exit(1)
     
     # Check if there are any WAV files
-    audio_files = glob.glob(os.path.join(args.input_dir, "*.wav"))
+    audio_files = segments.list_segments(args.input_dir, ".wav")
     if not audio_files:
         print(f"No WAV files found in '{args.input_dir}'", file=sys.stderr)
         sys.exit(1)
     
     print(f"Found {len(audio_files)} WAV files in {args.input_dir}")
     
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
     # Combine the audio segments
-    success = combine_audio_segments(args.input_dir, args.output)
+    success = combine_audio_segments(args.input_dir, args.output, jobs=jobs)
     
     if success:
         print(f"\n✓ Podcast successfully combined!")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+On-disk cache helpers shared by the podcast and transcription scripts
+
+Synthesized speech and decoded audio are both cached under
+~/.cache/doc-to-podcast, each in its own directory, with the same atomic
+writes and least-recently-used trimming.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+
+# Every cache lives in a subdirectory of this one
+CACHE_ROOT = Path.home() / ".cache" / "doc-to-podcast"
+
+
+def cache_path_for(cache_dir, prefix, request_key, extension):
+    """
+    Cache location for a request.
+    
+    Args:
+        cache_dir (Path): Cache directory
+        prefix (str): Kind of entry, e.g. "gtts"
+        request_key (str): Everything that affects the cached content
+        extension (str): File extension including the dot
+    
+    Returns:
+        Path: Cache file for this request
+    """
+    digest = hashlib.blake2b(request_key.encode("utf-8"), digest_size=16).hexdigest()
+    return cache_dir / f"{prefix}_{digest}{extension}"
+
+
+def touch_hit(cache_path):
+    """Mark a cache entry as recently used so trim_cache evicts it last."""
+    try:
+        os.utime(cache_path)
+    except OSError:
+        pass
+
+
+def replace_atomically(cache_path, write):
+    """
+    Create a cache entry through a temporary file so readers never see partial files.
+    
+    Args:
+        cache_path (Path): Cache file to create or replace
+        write (callable): Called with the open file descriptor and path of
+            the temporary file, and must fill it in
+    """
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+    try:
+        write(fd, temp_path)
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def trim_cache(cache_dir, max_bytes, prefix=None):
+    """
+    Delete the least recently used cache files until they fit the budget.
+    
+    Cache hits refresh a file's modification time (see touch_hit), so the
+    oldest mtime marks the least recently used entry (access times are
+    unreliable on relatime or noatime mounts).
+    
+    Args:
+        cache_dir (Path): Cache directory
+        max_bytes (int): Maximum total size of the files considered
+        prefix (str): Only consider entries created with this prefix, so
+            each kind of entry keeps its own budget; None for all files
+    """
+    if not cache_dir.is_dir():
+        return
+    
+    paths = cache_dir.glob(f"{prefix}_*") if prefix else cache_dir.iterdir()
+    entries = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+            total -= size
+        except OSError:
+            pass
@@ -6,26 +6,56 @@ This script converts a JSON podcast script into an engaging audio podcast
 with distinct Latin American Spanish voices for different speakers.
 """
 
+import functools
 import json
-import os
 import sys
 import argparse
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 from pydub import AudioSegment
 from pydub.playback import play
 import time
+import tts_cache
+import script_io
+
+
+# One second of the 440 Hz placeholder tone as 16-bit PCM; longer tones are tiled from it
+PLACEHOLDER_SAMPLE_RATE = 44100
+PLACEHOLDER_TONE = (
+    np.sin(2 * np.pi * 440 * np.arange(PLACEHOLDER_SAMPLE_RATE) / PLACEHOLDER_SAMPLE_RATE)
+    * 0.3 * 32767
+).astype(np.int16)
+
+
+@functools.lru_cache(maxsize=None)
+def _raw_silence(duration_ms, frame_rate, sample_width, channels):
+    """Return raw PCM silence in the given format for joining without an AudioSegment."""
+    return b"\x00" * (duration_ms * frame_rate // 1000 * sample_width * channels)
 
 
 class PodcastGenerator:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, max_workers=8, use_cache=True, cache_max_mb=500):
         """
         Initialize the podcast generator.
         
         Args:
             api_key (str): API key for text-to-speech service (optional)
+            max_workers (int): Number of text-to-speech requests to run at once
+            use_cache (bool): Whether to reuse previously synthesized lines
+            cache_max_mb (int): Size budget for the speech cache in megabytes
         """
         self.api_key = api_key
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.cache_max_bytes = cache_max_mb * 1024 * 1024
+        
+        # One pooled session so concurrent requests reuse HTTPS connections
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        
         self.voices = {
             "MIGUEL": {
                 "name": "Miguel",
@@ -49,14 +79,7 @@ class PodcastGenerator:
         Returns:
             list: List of dialogue entries
         """
-        try:
-            with open(script_path, 'r', encoding='utf-8') as f:
-                script = json.load(f)
-            return script
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Script file not found: {script_path}")
-        except json.JSONDecodeError:
-            raise ValueError(f"Invalid JSON format in script file: {script_path}")
+        return script_io.load_script(script_path)
     
     def text_to_speech(self, text, voice_id, output_path):
         """
@@ -93,12 +116,26 @@ class PodcastGenerator:
             }
         }
         
+        request_key = json.dumps({"voice_id": voice_id, **data}, sort_keys=True)
+        cache_path = tts_cache.cache_path_for("elevenlabs", request_key, ".mp3")
+        
+        if self.use_cache and cache_path.exists():
+            tts_cache.link_or_copy(cache_path, output_path)
+            return True
+        
+        tts_cache.discard(output_path)
+        
         try:
-            response = requests.post(url, json=data, headers=headers)
-            response.raise_for_status()
+            # Stream the audio to disk as it arrives instead of buffering it all
+            with self.session.post(url, json=data, headers=headers, stream=True) as response:
+                response.raise_for_status()
+                
+                with open(output_path, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=64 * 1024):
+                        f.write(chunk)
             
-            with open(output_path, "wb") as f:
-                f.write(response.content)
+            if self.use_cache:
+                tts_cache.store_file(output_path, cache_path)
             
             return True
             
@@ -118,16 +155,13 @@ class PodcastGenerator:
             bool: True if successful
         """
         # Create a simple beep sound as placeholder
-        sample_rate = 44100
+        sample_rate = PLACEHOLDER_SAMPLE_RATE
         duration = len(text.split()) * 0.3  # Rough estimate: 0.3 seconds per word
         
-        # Generate a simple tone
-        import numpy as np
-        t = np.linspace(0, duration, int(sample_rate * duration), False)
-        tone = np.sin(2 * np.pi * 440 * t) * 0.3  # 440 Hz tone
-        
-        # Convert to 16-bit PCM
-        audio_data = (tone * 32767).astype(np.int16)
+        # Repeat the precomputed 440 Hz tone to the required length
+        num_samples = int(sample_rate * duration)
+        repeats = num_samples // sample_rate + 1
+        audio_data = np.tile(PLACEHOLDER_TONE, repeats)[:num_samples]
         
         # Save as WAV
         import wave
@@ -139,19 +173,51 @@ class PodcastGenerator:
         
         return True
     
-    def add_pause(self, audio_segment, duration_ms=500):
+    def combine_segments(self, segments):
         """
-        Add a pause between dialogue segments.
+        Join audio segments in a single pass.
+        
+        Adding AudioSegments with ``+`` copies the whole accumulated audio on
+        every call, which grows quadratically over a long podcast. Converting
+        each segment to a common format and joining the raw data once keeps
+        the copying linear.
+        
+        Silences are given as plain durations and emitted as raw zero bytes
+        already in the common format, so intro, outro and pauses never need
+        an AudioSegment or a resampling pass.
         
         Args:
-            audio_segment (AudioSegment): Audio to add pause to
-            duration_ms (int): Duration of pause in milliseconds
+            segments (list): AudioSegments, or silence lengths in milliseconds,
+                in playback order
             
         Returns:
-            AudioSegment: Audio with pause added
+            AudioSegment: The combined audio
         """
-        silence = AudioSegment.silent(duration=duration_ms)
-        return audio_segment + silence
+        audio = [segment for segment in segments if isinstance(segment, AudioSegment)]
+        if not audio:
+            # Only silence; borrow pydub's default format for it
+            audio = [AudioSegment.silent(duration=0)]
+        
+        frame_rate = max(segment.frame_rate for segment in audio)
+        channels = max(segment.channels for segment in audio)
+        sample_width = max(segment.sample_width for segment in audio)
+        
+        raw_data = b"".join(
+            segment.set_frame_rate(frame_rate)
+                   .set_channels(channels)
+                   .set_sample_width(sample_width)
+                   .raw_data
+            if isinstance(segment, AudioSegment)
+            else _raw_silence(segment, frame_rate, sample_width, channels)
+            for segment in segments
+        )
+        
+        return AudioSegment(
+            data=raw_data,
+            sample_width=sample_width,
+            frame_rate=frame_rate,
+            channels=channels
+        )
     
     def generate_podcast(self, script_path, output_path, add_intro=True, add_outro=True):
         """
@@ -170,56 +236,73 @@ class PodcastGenerator:
         script = self.load_script(script_path)
         
         print("Generating podcast audio...")
-        podcast_audio = AudioSegment.empty()
+        
+        # Speech as AudioSegments and silences as durations in milliseconds,
+        # all joined in one pass at the end
+        segments = []
         
         # Add intro music if requested
         if add_intro:
             print("Adding intro music...")
             intro_duration = 3000  # 3 seconds
-            intro = AudioSegment.silent(duration=intro_duration)
-            podcast_audio += intro
+            segments.append(intro_duration)
         
-        # Process each dialogue segment
-        for i, entry in enumerate(script):
-            speaker = entry["speaker"]
-            line = entry["line"]
-            
-            if speaker not in self.voices:
-                print(f"Warning: Unknown speaker '{speaker}', skipping...")
-                continue
-            
-            voice_info = self.voices[speaker]
-            print(f"Generating audio for {voice_info['name']}: {line[:50]}...")
-            
-            # Generate temporary audio file
-            temp_audio_path = f"temp_{speaker}_{i}.mp3"
-            
-            if self.text_to_speech(line, voice_info["voice_id"], temp_audio_path):
-                # Load and add to podcast
-                segment_audio = AudioSegment.from_mp3(temp_audio_path)
-                podcast_audio += segment_audio
-                
-                # Add pause between speakers
-                if i < len(script) - 1:
-                    podcast_audio = self.add_pause(podcast_audio, 800)
+        # Submit every dialogue segment up front so the API calls overlap
+        jobs = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                for i, entry in enumerate(script):
+                    speaker = entry["speaker"]
+                    line = entry["line"]
+                    
+                    if speaker not in self.voices:
+                        print(f"Warning: Unknown speaker '{speaker}', skipping...")
+                        continue
+                    
+                    voice_info = self.voices[speaker]
+                    print(f"Generating audio for {voice_info['name']}: {line[:50]}...")
+                    
+                    # Generate temporary audio file
+                    temp_audio_path = f"temp_{speaker}_{i}.mp3"
+                    future = executor.submit(
+                        self.text_to_speech, line, voice_info["voice_id"], temp_audio_path
+                    )
+                    jobs.append((i, speaker, temp_audio_path, future))
                 
-                # Clean up temporary file
-                os.remove(temp_audio_path)
-            else:
-                print(f"Failed to generate audio for {speaker}")
-                return False
+                # Stitch the finished segments together in script order
+                for i, speaker, temp_audio_path, future in jobs:
+                    if future.result():
+                        # Load and add to podcast
+                        segments.append(AudioSegment.from_mp3(temp_audio_path))
+                        
+                        # Add pause between speakers
+                        if i < len(script) - 1:
+                            segments.append(800)
+                    else:
+                        print(f"Failed to generate audio for {speaker}")
+                        executor.shutdown(cancel_futures=True)
+                        return False
+        finally:
+            # The executor has already waited for in-flight requests here, so
+            # no job can write its file after it is removed
+            for _, _, temp_audio_path, _ in jobs:
+                tts_cache.discard(temp_audio_path)
         
         # Add outro music if requested
         if add_outro:
             print("Adding outro music...")
             outro_duration = 2000  # 2 seconds
-            outro = AudioSegment.silent(duration=outro_duration)
-            podcast_audio += outro
+            segments.append(outro_duration)
+        
+        podcast_audio = self.combine_segments(segments)
         
         # Export final podcast
         print(f"Exporting podcast to: {output_path}")
         podcast_audio.export(output_path, format="mp3", bitrate="192k")
         
+        if self.use_cache:
+            tts_cache.trim_cache(self.cache_max_bytes, "elevenlabs")
+        
         print("Podcast generation completed successfully!")
         return True
 
@@ -253,6 +336,26 @@ Examples:
         help="ElevenLabs API key for high-quality text-to-speech"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of concurrent text-to-speech requests (default: 8)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call the API instead of reusing cached audio"
+    )
+    
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=500,
+        help="Size budget for the speech cache in megabytes (default: 500)"
+    )
+    
     parser.add_argument(
         "--no-intro",
         action="store_true",
@@ -274,7 +377,12 @@ Examples:
     args = parser.parse_args()
     
     try:
-        generator = PodcastGenerator(api_key=args.api_key)
+        generator = PodcastGenerator(
+            api_key=args.api_key,
+            max_workers=args.workers,
+            use_cache=not args.no_cache,
+            cache_max_mb=args.cache_max_mb
+        )
         
         success = generator.generate_podcast(
             script_path=args.script_file,
@@ -7,37 +7,80 @@ using Coqui TTS with high-quality, human-sounding voices.
 Supports both default voices and voice cloning from audio samples.
 """
 
+import functools
+import hashlib
 import json
 import os
 import sys
 import argparse
-from pathlib import Path
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 import torch
 from TTS.api import TTS
-import time
+import tts_cache
+import script_io
+
+
+@functools.lru_cache(maxsize=16)
+def _file_digest(path, mtime):
+    """Hash a voice sample; the mtime argument invalidates the memo when the file changes."""
+    with open(path, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
 
 
 class CoquiPodcastGenerator:
-    def __init__(self, use_gpu=False, use_voice_cloning=False):
+    def __init__(self, use_gpu=False, use_voice_cloning=False, use_multi_gpu=False,
+                 use_compile=False, use_cache=True, cache_max_mb=2000):
         """
         Initialize the Coqui TTS podcast generator.
         
         Args:
             use_gpu (bool): Whether to use GPU acceleration if available
             use_voice_cloning (bool): Whether to use voice cloning (requires sample files)
+            use_multi_gpu (bool): Whether to load a model replica on every visible GPU
+            use_compile (bool): Whether to compile the vocoder with torch.compile
+            use_cache (bool): Whether to reuse previously synthesized segments
+            cache_max_mb (int): Size budget for the segment cache in megabytes
         """
         self.device = "cuda" if use_gpu and torch.cuda.is_available() else "cpu"
         self.use_voice_cloning = use_voice_cloning
+        self.use_cache = use_cache
+        self.cache_max_bytes = cache_max_mb * 1024 * 1024
         print(f"Using device: {self.device}")
         
         # Initialize TTS with multilingual model
         print("Loading TTS model...")
         if use_voice_cloning:
             # Use XTTS v2 for voice cloning
-            self.tts = TTS("tts_models/multilingual/multi-dataset/xtts_v2").to(self.device)
+            model_name = "tts_models/multilingual/multi-dataset/xtts_v2"
         else:
             # Use a simpler multilingual model for default voices
-            self.tts = TTS("tts_models/multilingual/multi-dataset/xtts_v1.1").to(self.device)
+            model_name = "tts_models/multilingual/multi-dataset/xtts_v1.1"
+        self.model_name = model_name
+        self.tts = TTS(model_name).to(self.device)
+        
+        # Segments are independent, so extra GPUs each get their own replica
+        self.replicas = [self.tts]
+        self.replica_devices = [self.device]
+        if use_multi_gpu and self.device == "cuda":
+            for index in range(1, torch.cuda.device_count()):
+                print(f"Loading TTS model replica on cuda:{index}...")
+                self.replicas.append(TTS(model_name).to(f"cuda:{index}"))
+                self.replica_devices.append(f"cuda:{index}")
+        
+        # The HiFi-GAN vocoder is a fixed stack of convolutions, which
+        # torch.compile can fuse and replay through CUDA graphs
+        self.use_compile = use_compile and hasattr(torch, "compile")
+        self._warmed_up = False
+        if use_compile and not self.use_compile:
+            print("Warning: torch.compile requires PyTorch 2.0 or newer, skipping compilation")
+        if self.use_compile:
+            print("Compiling vocoder...")
+            for tts in self.replicas:
+                tts_model = tts.synthesizer.tts_model
+                tts_model.hifigan_decoder = torch.compile(
+                    tts_model.hifigan_decoder, mode="reduce-overhead"
+                )
         
         # Voice configurations
         self.voices = {
@@ -67,14 +110,7 @@ class CoquiPodcastGenerator:
         Returns:
             list: List of dialogue entries
         """
-        try:
-            with open(script_path, 'r', encoding='utf-8') as f:
-                script = json.load(f)
-            return script
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Script file not found: {script_path}")
-        except json.JSONDecodeError:
-            raise ValueError(f"Invalid JSON format in script file: {script_path}")
+        return script_io.load_script(script_path)
     
     def create_default_voice_samples(self):
         """Create default voice samples for testing."""
@@ -102,7 +138,93 @@ class CoquiPodcastGenerator:
         
         print("✓ Default voice samples created")
     
-    def text_to_speech(self, text, voice_info, output_path):
+    def _precompute_latents(self):
+        """
+        Compute the XTTS conditioning latents for each cloned voice once.
+        
+        Passing ``speaker_wav`` to ``tts_to_file`` re-runs the speaker encoder
+        on the sample for every segment; caching the latents per voice means
+        the encoder runs once per speaker instead of once per line. In server
+        mode they are kept across jobs and only recomputed when a voice
+        sample's modification time changes.
+        """
+        tts_model = self.tts.synthesizer.tts_model
+        
+        for voice_info in self.voices.values():
+            voice_file = voice_info['voice_file']
+            if not os.path.exists(voice_file):
+                voice_info.pop('latents', None)
+                voice_info.pop('latents_mtime', None)
+                continue
+            
+            mtime = os.path.getmtime(voice_file)
+            if voice_info.get('latents_mtime') == mtime:
+                continue
+            
+            print(f"  Computing voice latents for {voice_info['name']}...")
+            gpt_cond_latent, speaker_embedding = tts_model.get_conditioning_latents(
+                audio_path=[voice_info['voice_file']]
+            )
+            
+            # Keep one copy of the latents on each replica's device
+            voice_info['latents'] = [
+                (gpt_cond_latent.to(device), speaker_embedding.to(device))
+                for device in self.replica_devices
+            ]
+            voice_info['latents_mtime'] = mtime
+    
+    def _warm_up(self):
+        """
+        Run one short synthesis on every replica so compilation and CUDA
+        graph capture happen before the first real segment. The compiled
+        graphs outlive the job, so a server warms up only once.
+        """
+        if self._warmed_up:
+            return
+        
+        voice_info = next(
+            (voice for voice in self.voices.values() if 'latents' in voice), None
+        )
+        if voice_info is None:
+            return
+        
+        print("Warming up compiled vocoder...")
+        with torch.inference_mode(), torch.autocast(
+            device_type="cuda", dtype=torch.float16, enabled=self.device == "cuda"
+        ):
+            for replica, tts in enumerate(self.replicas):
+                gpt_cond_latent, speaker_embedding = voice_info['latents'][replica]
+                tts.synthesizer.tts_model.inference(
+                    text="Hola.",
+                    language=voice_info["language"],
+                    gpt_cond_latent=gpt_cond_latent,
+                    speaker_embedding=speaker_embedding
+                )
+        self._warmed_up = True
+    
+    def _cache_path(self, text, voice_info):
+        """
+        Build the cache location for a synthesized segment.
+        
+        Args:
+            text (str): Text being synthesized
+            voice_info (dict): Voice configuration
+            
+        Returns:
+            Path: Cache file for this model, voice, and text
+        """
+        voice_file = voice_info['voice_file']
+        if self.use_voice_cloning and os.path.exists(voice_file):
+            voice_key = _file_digest(voice_file, os.path.getmtime(voice_file))
+        else:
+            voice_key = "default"
+        
+        request_key = "|".join([
+            self.model_name, voice_key, voice_info["language"], str(voice_info["speed"]), text
+        ])
+        return tts_cache.cache_path_for("coqui", request_key, ".wav")
+    
+    def text_to_speech(self, text, voice_info, output_path, replica=0):
         """
         Convert text to speech using Coqui TTS.
         
@@ -110,16 +232,39 @@ class CoquiPodcastGenerator:
             text (str): Text to convert to speech
             voice_info (dict): Voice configuration
             output_path (str): Path to save the audio file
+            replica (int): Index of the model replica to synthesize with
             
         Returns:
             bool: True if successful, False otherwise
         """
+        tts = self.replicas[replica]
+        
         try:
+            cache_path = self._cache_path(text, voice_info)
+            if self.use_cache and cache_path.exists():
+                tts_cache.link_or_copy(cache_path, output_path)
+                print(f"  ✓ Reused cached audio: {output_path}")
+                return True
+            
+            tts_cache.discard(output_path)
+            
             print(f"  Generating speech for {voice_info['name']}...")
             
-            if self.use_voice_cloning and os.path.exists(voice_info['voice_file']):
+            if self.use_voice_cloning and 'latents' in voice_info:
+                # Use voice cloning with the cached speaker latents
+                gpt_cond_latent, speaker_embedding = voice_info['latents'][replica]
+                result = tts.synthesizer.tts_model.inference(
+                    text=text,
+                    language=voice_info["language"],
+                    gpt_cond_latent=gpt_cond_latent,
+                    speaker_embedding=speaker_embedding,
+                    speed=voice_info["speed"],
+                    enable_text_splitting=True
+                )
+                tts.synthesizer.save_wav(result["wav"], output_path)
+            elif self.use_voice_cloning and os.path.exists(voice_info['voice_file']):
                 # Use voice cloning
-                self.tts.tts_to_file(
+                tts.tts_to_file(
                     text=text,
                     file_path=output_path,
                     speaker_wav=voice_info['voice_file'],
@@ -128,13 +273,16 @@ class CoquiPodcastGenerator:
                 )
             else:
                 # Use default voice
-                self.tts.tts_to_file(
+                tts.tts_to_file(
                     text=text,
                     file_path=output_path,
                     language=voice_info["language"],
                     speed=voice_info["speed"]
                 )
             
+            if self.use_cache:
+                tts_cache.store_file(output_path, cache_path)
+            
             print(f"  ✓ Saved to: {output_path}")
             return True
             
@@ -142,9 +290,68 @@ class CoquiPodcastGenerator:
             print(f"  ✗ Error generating speech: {e}")
             return False
     
+    def group_speaker_turns(self, script):
+        """
+        Merge consecutive dialogue entries from the same speaker.
+        
+        Each model call carries a fixed setup cost, so a speaker's back-to-back
+        lines are synthesized together as one segment.
+        
+        Args:
+            script (list): List of dialogue entries
+            
+        Returns:
+            list: (speaker, text) tuples, one per speaker turn
+        """
+        turns = []
+        
+        for entry in script:
+            speaker = entry["speaker"]
+            line = entry["line"]
+            
+            if speaker not in self.voices:
+                print(f"Warning: Unknown speaker '{speaker}', skipping...")
+                continue
+            
+            if turns and turns[-1][0] == speaker:
+                turns[-1] = (speaker, f"{turns[-1][1]} {line}")
+            else:
+                turns.append((speaker, line))
+        
+        return turns
+    
+    def _synthesize_turns(self, replica, jobs, total):
+        """
+        Synthesize a list of speaker turns on one model replica.
+        
+        Args:
+            replica (int): Index of the model replica to use
+            jobs (list): (index, speaker, text, output_path) tuples
+            total (int): Total number of turns, for progress output
+            
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        # Synthesis is inference only: skip autograd bookkeeping and run the
+        # model in half precision when it is on the GPU. Both contexts are
+        # thread-local, so they are entered here rather than by the caller.
+        with torch.inference_mode(), torch.autocast(
+            device_type="cuda", dtype=torch.float16, enabled=self.device == "cuda"
+        ):
+            for i, speaker, line, output_path in jobs:
+                voice_info = self.voices[speaker]
+                print(f"\nSegment {i+1}/{total} - {voice_info['name']}:")
+                print(f"  Text: {line[:80]}{'...' if len(line) > 80 else ''}")
+                
+                if not self.text_to_speech(line, voice_info, output_path, replica=replica):
+                    print(f"Failed to generate audio for {speaker}")
+                    return False
+        
+        return True
+    
     def generate_podcast_segments(self, script_path, output_dir="coqui_podcast_segments"):
         """
-        Generate individual audio segments for each dialogue entry.
+        Generate individual audio segments for each speaker turn.
         
         Args:
             script_path (str): Path to the JSON script file
@@ -155,10 +362,15 @@ class CoquiPodcastGenerator:
         """
         print("Loading podcast script...")
         script = self.load_script(script_path)
+        turns = self.group_speaker_turns(script)
         
         # Create voice samples if using voice cloning
         if self.use_voice_cloning:
             self.create_default_voice_samples()
+            self._precompute_latents()
+        
+        if self.use_compile:
+            self._warm_up()
         
         # Create output directory
         os.makedirs(output_dir, exist_ok=True)
@@ -171,28 +383,27 @@ class CoquiPodcastGenerator:
         print(f"  Voice Cloning: {'Enabled' if self.use_voice_cloning else 'Disabled'}")
         print("=" * 60)
         
-        # Process each dialogue segment
-        for i, entry in enumerate(script):
-            speaker = entry["speaker"]
-            line = entry["line"]
-            
-            if speaker not in self.voices:
-                print(f"Warning: Unknown speaker '{speaker}', skipping...")
-                continue
-            
-            voice_info = self.voices[speaker]
-            print(f"\nSegment {i+1}/{len(script)} - {voice_info['name']}:")
-            print(f"  Text: {line[:80]}{'...' if len(line) > 80 else ''}")
-            
-            # Generate audio file
-            output_path = os.path.join(output_dir, f"{i+1:03d}_{speaker}_{voice_info['name']}.wav")
-            
-            if not self.text_to_speech(line, voice_info, output_path):
-                print(f"Failed to generate audio for {speaker}")
-                return False
-            
-            # Small delay to avoid overwhelming the system
-            time.sleep(0.5)
+        jobs = [
+            (i, speaker, line, os.path.join(output_dir, f"{i+1:03d}_{speaker}_{self.voices[speaker]['name']}.wav"))
+            for i, (speaker, line) in enumerate(turns)
+        ]
+        
+        if len(self.replicas) == 1:
+            success = self._synthesize_turns(0, jobs, len(turns))
+        else:
+            # Deal the turns out round-robin; each replica works through its share in order
+            with ThreadPoolExecutor(max_workers=len(self.replicas)) as executor:
+                futures = [
+                    executor.submit(self._synthesize_turns, replica, jobs[replica::len(self.replicas)], len(turns))
+                    for replica in range(len(self.replicas))
+                ]
+                success = all([future.result() for future in futures])
+        
+        if not success:
+            return False
+        
+        if self.use_cache:
+            tts_cache.trim_cache(self.cache_max_bytes, "coqui")
         
         print("\n" + "=" * 60)
         print("Podcast generation completed successfully!")
@@ -204,6 +415,46 @@ class CoquiPodcastGenerator:
         return True
 
 
+def serve(generator, default_output_dir="coqui_podcast_segments"):
+    """
+    Run generation jobs read from stdin with the model kept loaded.
+    
+    Each input line is a JSON object such as
+    ``{"script_path": "script.json", "output_dir": "segments"}``. Progress
+    output goes to stderr, and one JSON status line is written to stdout per
+    job, so a client can drive the server over a pipe.
+    
+    Args:
+        generator (CoquiPodcastGenerator): Generator with the model loaded
+        default_output_dir (str): Output directory for jobs that omit one
+    """
+    print("Server ready, reading jobs from stdin...", file=sys.stderr)
+    
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        
+        try:
+            job = json.loads(line)
+            output_dir = job.get("output_dir", default_output_dir)
+            
+            with contextlib.redirect_stdout(sys.stderr):
+                success = generator.generate_podcast_segments(
+                    script_path=job["script_path"],
+                    output_dir=output_dir
+                )
+            
+            if success:
+                response = {"status": "done", "output_dir": output_dir}
+            else:
+                response = {"status": "error", "error": "Failed to generate podcast segments"}
+        except Exception as e:
+            response = {"status": "error", "error": str(e)}
+        
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
 def main():
     """Main function to handle command line arguments and run podcast generation."""
     parser = argparse.ArgumentParser(
@@ -213,12 +464,14 @@ def main():
 Examples:
   python generate_podcast_coqui.py script.json -o coqui_podcast_segments
   python generate_podcast_coqui.py script.json --voice-cloning --gpu
+  python generate_podcast_coqui.py --server --voice-cloning --gpu
         """
     )
     
     parser.add_argument(
         "script_file",
-        help="Path to the JSON podcast script file"
+        nargs="?",
+        help="Path to the JSON podcast script file (omit with --server)"
     )
     
     parser.add_argument(
@@ -239,6 +492,38 @@ Examples:
         help="Use GPU acceleration if available"
     )
     
+    parser.add_argument(
+        "--multi-gpu",
+        action="store_true",
+        help="Load a model replica on every visible GPU and synthesize segments in parallel"
+    )
+    
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Compile the vocoder with torch.compile (PyTorch 2.0+, slower startup)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always synthesize instead of reusing cached audio"
+    )
+    
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=2000,
+        help="Size budget for the segment cache in megabytes; WAV segments are "
+             "large and slow to regenerate (default: 2000)"
+    )
+    
+    parser.add_argument(
+        "--server",
+        action="store_true",
+        help="Keep the model loaded and read JSON jobs from stdin, one per line"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -247,11 +532,25 @@ Examples:
     
     args = parser.parse_args()
     
+    if not args.server and not args.script_file:
+        parser.error("script_file is required unless --server is given")
+    
     try:
-        generator = CoquiPodcastGenerator(
-            use_gpu=args.gpu,
-            use_voice_cloning=args.voice_cloning
-        )
+        # In server mode stdout carries only job responses
+        log_target = contextlib.redirect_stdout(sys.stderr) if args.server else contextlib.nullcontext()
+        with log_target:
+            generator = CoquiPodcastGenerator(
+                use_gpu=args.gpu,
+                use_voice_cloning=args.voice_cloning,
+                use_multi_gpu=args.multi_gpu,
+                use_compile=args.compile,
+                use_cache=not args.no_cache,
+                cache_max_mb=args.cache_max_mb
+            )
+        
+        if args.server:
+            serve(generator, default_output_dir=args.output_dir)
+            return
         
         success = generator.generate_podcast_segments(
             script_path=args.script_file,
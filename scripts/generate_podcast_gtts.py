@@ -6,19 +6,189 @@ This script converts a JSON podcast script into an engaging audio podcast
 with distinct Latin American Spanish voices for different speakers using gTTS.
 """
 
-import json
-import os
+import functools
+import io
 import sys
 import argparse
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from gtts import gTTS
-from pydub import AudioSegment
-import time
+import av
+import numpy as np
+import tts_cache
+import script_io
+
+# Podcast audio is assembled as 16-bit mono samples at gTTS's native rate
+SAMPLE_RATE = 24000
+
+
+@functools.lru_cache(maxsize=None)
+def _silence(duration_ms):
+    """Return shared silent samples; the same few durations are reused for every pause."""
+    samples = np.zeros(duration_ms * SAMPLE_RATE // 1000, dtype=np.int16)
+    samples.flags.writeable = False
+    return samples
+
+
+def _decode_mp3(mp3_data):
+    """
+    Decode an MP3 in memory into podcast-format samples.
+    
+    gTTS serves 24 kHz mono audio, which passes through the resampler
+    unchanged; anything else is converted rather than joined at the wrong rate.
+    
+    Args:
+        mp3_data (bytes): MP3 audio
+        
+    Returns:
+        numpy.ndarray: 16-bit mono samples at SAMPLE_RATE
+    """
+    resampler = av.AudioResampler(format='s16', layout='mono', rate=SAMPLE_RATE)
+    arrays = []
+    with av.open(io.BytesIO(mp3_data), format='mp3') as container:
+        for frame in container.decode(audio=0):
+            arrays.extend(resampled.to_ndarray() for resampled in resampler.resample(frame))
+        # Drain samples still buffered in the resampler
+        arrays.extend(resampled.to_ndarray() for resampled in resampler.resample(None))
+    
+    if not arrays:
+        return np.zeros(0, dtype=np.int16)
+    return np.concatenate(arrays, axis=1).reshape(-1)
+
+
+def _encode_mp3(samples, output, bitrate=None, bare=False):
+    """
+    Encode podcast-format samples to MP3 in-process.
+    
+    Variable bitrate at quality 5 (roughly 40 kbps for 24 kHz mono speech)
+    is transparent for speech and costs the encoder far less than 192 kbps
+    constant bitrate.
+    The output keeps the 24 kHz mono format, so nothing is upsampled.
+    
+    Args:
+        samples (numpy.ndarray): 16-bit mono samples at SAMPLE_RATE
+        output (str or file-like): Where to write the MP3
+        bitrate (int): Constant bitrate in kbps, or None for VBR quality 5
+        bare (bool): Write only audio frames, without ID3 or Xing headers
+    """
+    samples = samples.reshape(1, -1)
+    container_options = {'id3v2_version': '0', 'write_xing': '0'} if bare else {}
+    
+    with av.open(output, 'w', format='mp3', options=container_options) as container:
+        if bitrate is None:
+            # Equivalent of ffmpeg's -q:a 5 (global_quality is scaled by FF_QP2LAMBDA)
+            stream = container.add_stream(
+                'mp3', rate=SAMPLE_RATE, options={'flags': '+qscale', 'global_quality': str(5 * 118)}
+            )
+        else:
+            stream = container.add_stream('mp3', rate=SAMPLE_RATE)
+            stream.bit_rate = bitrate * 1000
+        stream.layout = 'mono'
+        
+        # The frame size is known once the codec is open; at 24 kHz it is an
+        # MPEG-2 Layer III frame of 576 samples
+        stream.codec_context.open()
+        frame_size = stream.codec_context.frame_size
+        for start in range(0, samples.shape[1], frame_size):
+            # Mono planar and packed samples share a layout, and LAME wants planar
+            frame = av.AudioFrame.from_ndarray(
+                np.ascontiguousarray(samples[:, start:start + frame_size]), format='s16p', layout='mono'
+            )
+            frame.sample_rate = SAMPLE_RATE
+            frame.pts = start
+            container.mux(stream.encode(frame))
+        
+        # Flush the encoder
+        container.mux(stream.encode(None))
+
+
+@functools.lru_cache(maxsize=None)
+def _encoded_silence(duration_ms, bitrate=None):
+    """
+    Return bare MP3 frames of silence in the gTTS format for joining without re-encoding.
+    
+    LAME adds priming and padding frames that a bare stream has no header to
+    trim, so the silence is encoded that much shorter. The pause then plays
+    within one MP3 frame (24 ms) of the requested duration.
+    """
+    def encode(samples):
+        buffer = io.BytesIO()
+        _encode_mp3(samples, buffer, bitrate, bare=True)
+        return buffer.getvalue()
+    
+    samples = _silence(duration_ms)
+    padding = len(_decode_mp3(encode(samples))) - len(samples)
+    return encode(samples[:max(0, len(samples) - padding)])
+
+
+class PodcastAssembler:
+    """
+    Collect podcast audio in playback order and write it out in one pass.
+    
+    Speech and silence are kept as int16 sample arrays, joined with a single
+    np.concatenate and encoded once. With ``copy`` the gTTS MP3 frames are
+    kept as they are and simply written back to back; gTTS always serves
+    24 kHz mono MP3, so no decoding or re-encoding is needed.
+    """
+    
+    def __init__(self, bitrate=None, copy=False):
+        """
+        Initialize the assembler.
+        
+        Args:
+            bitrate (int): Constant MP3 bitrate in kbps, or None for VBR
+            copy (bool): Join MP3 frames as-is instead of decoding and re-encoding
+        """
+        self.bitrate = bitrate
+        self.copy = copy
+        self._chunks = []
+    
+    def add_mp3(self, mp3_data):
+        """Append synthesized speech."""
+        self._chunks.append(mp3_data if self.copy else _decode_mp3(mp3_data))
+    
+    def add_silence(self, duration_ms):
+        """Append a pause."""
+        if self.copy:
+            self._chunks.append(_encoded_silence(duration_ms, self.bitrate))
+        else:
+            self._chunks.append(_silence(duration_ms))
+    
+    def export(self, output_path):
+        """
+        Write the podcast as an MP3 file.
+        
+        Args:
+            output_path (str): Path to save the podcast
+        """
+        if self.copy:
+            with open(output_path, 'wb', buffering=1 << 20) as f:
+                f.writelines(self._chunks)
+            return
+        
+        samples = np.concatenate(self._chunks) if self._chunks else np.zeros(0, dtype=np.int16)
+        _encode_mp3(samples, output_path, self.bitrate)
 
 
 class PodcastGenerator:
-    def __init__(self):
-        """Initialize the podcast generator."""
+    def __init__(self, max_workers=8, use_cache=True, cache_max_mb=500, requests_per_second=10):
+        """
+        Initialize the podcast generator.
+        
+        Args:
+            max_workers (int): Number of text-to-speech requests to run at once
+            use_cache (bool): Whether to reuse previously synthesized lines
+            cache_max_mb (int): Size budget for the speech cache in megabytes
+            requests_per_second (float): Ceiling on gTTS HTTP requests per second
+        """
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.cache_max_bytes = cache_max_mb * 1024 * 1024
+        
+        # One pooled session so concurrent requests reuse HTTPS connections;
+        # it also paces every request gTTS sends, including each chunk of a
+        # long line
+        self.session = tts_cache.share_gtts_session(max_workers, requests_per_second)
+        
         self.voices = {
             "MIGUEL": {
                 "name": "Miguel",
@@ -34,6 +204,18 @@ class PodcastGenerator:
             }
         }
         
+    def iter_script(self, script_path):
+        """
+        Yield the dialogue entries of a JSON script file as they are parsed.
+        
+        Args:
+            script_path (str): Path to the JSON script file
+            
+        Yields:
+            dict: Dialogue entries in script order
+        """
+        return script_io.iter_script(script_path)
+    
     def load_script(self, script_path):
         """
         Load the podcast script from JSON file.
@@ -44,55 +226,92 @@ class PodcastGenerator:
         Returns:
             list: List of dialogue entries
         """
-        try:
-            with open(script_path, 'r', encoding='utf-8') as f:
-                script = json.load(f)
-            return script
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Script file not found: {script_path}")
-        except json.JSONDecodeError:
-            raise ValueError(f"Invalid JSON format in script file: {script_path}")
+        return list(self.iter_script(script_path))
     
-    def text_to_speech(self, text, voice_info, output_path):
+    def _cache_path(self, text, voice_info):
         """
-        Convert text to speech using Google Text-to-Speech.
+        Cache location for a synthesized line.
         
         Args:
             text (str): Text to convert to speech
             voice_info (dict): Voice configuration
-            output_path (str): Path to save the audio file
             
         Returns:
-            bool: True if successful, False otherwise
+            Path: Cache file for this language, accent, and text
+        """
+        request_key = f"{voice_info['lang']}|{voice_info['tld']}|False|{text}"
+        return tts_cache.cache_path_for("gtts", request_key, ".mp3")
+    
+    def synthesize(self, text, voice_info):
+        """
+        Convert text to MP3 audio in memory, reusing cached audio when possible.
+        
+        Args:
+            text (str): Text to convert to speech
+            voice_info (dict): Voice configuration
+            
+        Returns:
+            bytes: MP3 audio, or None if synthesis failed
         """
+        cache_path = self._cache_path(text, voice_info)
+        
+        if self.use_cache and cache_path.exists():
+            # Hand the cached bytes straight to the caller; nothing is copied again
+            with open(cache_path, 'rb') as f:
+                audio_data = f.read()
+            tts_cache.touch_hit(cache_path)
+            return audio_data
+        
         try:
             # Create gTTS object with specific language and TLD for accent variation
             tts = gTTS(text=text, lang=voice_info["lang"], tld=voice_info["tld"], slow=False)
             
-            # Generate speech
-            tts.save(output_path)
+            # Generate speech in memory
+            buffer = io.BytesIO()
+            tts.write_to_fp(buffer)
+            audio_data = buffer.getvalue()
             
-            return True
+            if self.use_cache:
+                tts_cache.store_bytes(audio_data, cache_path)
+            
+            return audio_data
             
         except Exception as e:
             print(f"Error generating speech: {e}")
-            return False
+            return None
     
-    def add_pause(self, audio_segment, duration_ms=800):
+    def text_to_speech(self, text, voice_info, output_path=None, fp=None):
         """
-        Add a pause between dialogue segments.
+        Convert text to speech using Google Text-to-Speech.
         
         Args:
-            audio_segment (AudioSegment): Audio to add pause to
-            duration_ms (int): Duration of pause in milliseconds
+            text (str): Text to convert to speech
+            voice_info (dict): Voice configuration
+            output_path (str): Path to save the audio file
+            fp (file-like): Binary stream to write the MP3 to instead of a file
             
         Returns:
-            AudioSegment: Audio with pause added
+            bool: True if successful, False otherwise
         """
-        silence = AudioSegment.silent(duration=duration_ms)
-        return audio_segment + silence
+        cache_path = self._cache_path(text, voice_info)
+        if fp is None and self.use_cache and cache_path.exists():
+            tts_cache.link_or_copy(cache_path, output_path)
+            return True
+        
+        audio_data = self.synthesize(text, voice_info)
+        if audio_data is None:
+            return False
+        
+        if fp is not None:
+            fp.write(audio_data)
+        else:
+            tts_cache.discard(output_path)
+            with open(output_path, 'wb') as f:
+                f.write(audio_data)
+        return True
     
-    def generate_podcast(self, script_path, output_path, add_intro=True, add_outro=True):
+    def generate_podcast(self, script_path, output_path, add_intro=True, add_outro=True,
+                         bitrate=None, copy=False):
         """
         Generate the complete podcast from the script.
         
@@ -101,63 +320,80 @@ class PodcastGenerator:
             output_path (str): Path to save the final podcast
             add_intro (bool): Whether to add podcast intro music
             add_outro (bool): Whether to add podcast outro music
+            bitrate (int): Constant MP3 bitrate in kbps, or None for VBR
+            copy (bool): Join the gTTS MP3 frames as-is instead of decoding
+                and re-encoding the whole podcast
             
         Returns:
             bool: True if successful, False otherwise
         """
         print("Loading podcast script...")
-        script = self.load_script(script_path)
+        script = self.iter_script(script_path)
         
         print("Generating podcast audio...")
-        podcast_audio = AudioSegment.empty()
+        
+        # Collect the audio and join it once at the end
+        assembler = PodcastAssembler(bitrate=bitrate, copy=copy)
         
         # Add intro music if requested
         if add_intro:
             print("Adding intro music...")
             intro_duration = 3000  # 3 seconds
-            intro = AudioSegment.silent(duration=intro_duration)
-            podcast_audio += intro
+            assembler.add_silence(intro_duration)
         
-        # Process each dialogue segment
-        for i, entry in enumerate(script):
-            speaker = entry["speaker"]
-            line = entry["line"]
-            
-            if speaker not in self.voices:
-                print(f"Warning: Unknown speaker '{speaker}', skipping...")
-                continue
-            
-            voice_info = self.voices[speaker]
-            print(f"Generating audio for {voice_info['name']}: {line[:50]}...")
-            
-            # Generate temporary audio file
-            temp_audio_path = f"temp_{speaker}_{i}.mp3"
+        # Submit each dialogue segment as soon as it is parsed so the network
+        # calls overlap with each other and with the rest of the parse
+        jobs = []
+        script_length = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            try:
+                for i, entry in enumerate(script):
+                    script_length = i + 1
+                    speaker = entry["speaker"]
+                    line = entry["line"]
+                    
+                    if speaker not in self.voices:
+                        print(f"Warning: Unknown speaker '{speaker}', skipping...")
+                        continue
+                    
+                    voice_info = self.voices[speaker]
+                    print(f"Generating audio for {voice_info['name']}: {line[:50]}...")
+                    
+                    # Keep the MP3 in memory; no temporary file is needed
+                    future = executor.submit(self.synthesize, line, voice_info)
+                    jobs.append((i, speaker, future))
+            except Exception:
+                # Don't wait for segments of a script that failed to parse
+                executor.shutdown(cancel_futures=True)
+                raise
             
-            if self.text_to_speech(line, voice_info, temp_audio_path):
-                # Load and add to podcast
-                segment_audio = AudioSegment.from_mp3(temp_audio_path)
-                podcast_audio += segment_audio
-                
-                # Add pause between speakers
-                if i < len(script) - 1:
-                    podcast_audio = self.add_pause(podcast_audio, 800)
-                
-                # Clean up temporary file
-                os.remove(temp_audio_path)
-            else:
-                print(f"Failed to generate audio for {speaker}")
-                return False
+            # Stitch the finished segments together in script order
+            for i, speaker, future in jobs:
+                audio_data = future.result()
+                if audio_data is not None:
+                    # Load and add to podcast
+                    assembler.add_mp3(audio_data)
+                    
+                    # Add pause between speakers
+                    if i < script_length - 1:
+                        assembler.add_silence(800)
+                else:
+                    print(f"Failed to generate audio for {speaker}")
+                    executor.shutdown(cancel_futures=True)
+                    return False
         
         # Add outro music if requested
         if add_outro:
             print("Adding outro music...")
             outro_duration = 2000  # 2 seconds
-            outro = AudioSegment.silent(duration=outro_duration)
-            podcast_audio += outro
+            assembler.add_silence(outro_duration)
         
         # Export final podcast
         print(f"Exporting podcast to: {output_path}")
-        podcast_audio.export(output_path, format="mp3", bitrate="192k")
+        assembler.export(output_path)
+        
+        if self.use_cache:
+            tts_cache.trim_cache(self.cache_max_bytes, "gtts")
         
         print("Podcast generation completed successfully!")
         return True
@@ -172,6 +408,7 @@ def main():
 Examples:
   python generate_podcast_gtts.py script.json -o podcast.mp3
   python generate_podcast_gtts.py script.json --no-intro --no-outro -o podcast.mp3
+  python generate_podcast_gtts.py script.json --copy -o podcast.mp3
         """
     )
     
@@ -186,6 +423,13 @@ Examples:
         help="Output audio file path (default: podcast.mp3)"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of concurrent text-to-speech requests (default: 8)"
+    )
+    
     parser.add_argument(
         "--no-intro",
         action="store_true",
@@ -198,6 +442,41 @@ Examples:
         help="Skip outro music"
     )
     
+    parser.add_argument(
+        "--bitrate",
+        type=int,
+        help="Constant MP3 bitrate in kbps (default: VBR quality 5, roughly 40 kbps, "
+             "transparent for mono speech)"
+    )
+    
+    parser.add_argument(
+        "--copy",
+        action="store_true",
+        help="Join the gTTS MP3 frames directly instead of re-encoding the podcast "
+             "(fastest; --bitrate then applies only to the pauses)"
+    )
+    
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=10,
+        help="Maximum gTTS HTTP requests per second across all workers; lines over "
+             "100 characters take several requests (default: 10)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call gTTS instead of reusing cached audio"
+    )
+    
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=500,
+        help="Size budget for the speech cache in megabytes (default: 500)"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -207,13 +486,20 @@ Examples:
     args = parser.parse_args()
     
     try:
-        generator = PodcastGenerator()
+        generator = PodcastGenerator(
+            max_workers=args.workers,
+            use_cache=not args.no_cache,
+            cache_max_mb=args.cache_max_mb,
+            requests_per_second=args.rps
+        )
         
         success = generator.generate_podcast(
             script_path=args.script_file,
             output_path=args.output,
             add_intro=not args.no_intro,
-            add_outro=not args.no_outro
+            add_outro=not args.no_outro,
+            bitrate=args.bitrate,
+            copy=args.copy
         )
         
         if success:
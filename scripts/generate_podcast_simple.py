@@ -6,18 +6,35 @@ This script converts a JSON podcast script into individual audio files
 with distinct Latin American Spanish voices for different speakers.
 """
 
-import json
 import os
 import sys
 import argparse
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from gtts import gTTS
-import time
+import tts_cache
+import script_io
 
 
 class SimplePodcastGenerator:
-    def __init__(self):
-        """Initialize the podcast generator."""
+    def __init__(self, max_workers=8, use_cache=True, cache_max_mb=500, requests_per_second=10):
+        """
+        Initialize the podcast generator.
+        
+        Args:
+            max_workers (int): Number of text-to-speech requests to run at once
+            use_cache (bool): Whether to reuse previously synthesized lines
+            cache_max_mb (int): Size budget for the speech cache in megabytes
+            requests_per_second (float): Ceiling on gTTS HTTP requests per second
+        """
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.cache_max_bytes = cache_max_mb * 1024 * 1024
+        
+        # One pooled session so concurrent requests reuse HTTPS connections;
+        # it also paces every request gTTS sends, including each chunk of a
+        # long line
+        self.session = tts_cache.share_gtts_session(max_workers, requests_per_second)
+        
         self.voices = {
             "MIGUEL": {
                 "name": "Miguel",
@@ -43,14 +60,7 @@ class SimplePodcastGenerator:
         Returns:
             list: List of dialogue entries
         """
-        try:
-            with open(script_path, 'r', encoding='utf-8') as f:
-                script = json.load(f)
-            return script
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Script file not found: {script_path}")
-        except json.JSONDecodeError:
-            raise ValueError(f"Invalid JSON format in script file: {script_path}")
+        return script_io.load_script(script_path)
     
     def text_to_speech(self, text, voice_info, output_path):
         """
@@ -64,6 +74,16 @@ class SimplePodcastGenerator:
         Returns:
             bool: True if successful, False otherwise
         """
+        request_key = f"{voice_info['lang']}|{voice_info['tld']}|False|{text}"
+        cache_path = tts_cache.cache_path_for("gtts", request_key, ".mp3")
+        
+        if self.use_cache and cache_path.exists():
+            tts_cache.link_or_copy(cache_path, output_path)
+            print(f"  ✓ Reused cached audio: {output_path}")
+            return True
+        
+        tts_cache.discard(output_path)
+        
         try:
             print(f"  Generating speech for {voice_info['name']}...")
             
@@ -73,6 +93,9 @@ class SimplePodcastGenerator:
             # Generate speech
             tts.save(output_path)
             
+            if self.use_cache:
+                tts_cache.store_file(output_path, cache_path)
+            
             print(f"  ✓ Saved to: {output_path}")
             return True
             
@@ -100,28 +123,35 @@ class SimplePodcastGenerator:
         print(f"Generating podcast segments in: {output_dir}")
         print("=" * 50)
         
-        # Process each dialogue segment
-        for i, entry in enumerate(script):
-            speaker = entry["speaker"]
-            line = entry["line"]
-            
-            if speaker not in self.voices:
-                print(f"Warning: Unknown speaker '{speaker}', skipping...")
-                continue
-            
-            voice_info = self.voices[speaker]
-            print(f"\nSegment {i+1}/{len(script)} - {voice_info['name']}:")
-            print(f"  Text: {line[:80]}{'...' if len(line) > 80 else ''}")
-            
-            # Generate audio file
-            output_path = os.path.join(output_dir, f"{i+1:03d}_{speaker}_{voice_info['name']}.mp3")
-            
-            if not self.text_to_speech(line, voice_info, output_path):
-                print(f"Failed to generate audio for {speaker}")
-                return False
+        # Submit every dialogue segment up front so the network calls overlap
+        jobs = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for i, entry in enumerate(script):
+                speaker = entry["speaker"]
+                line = entry["line"]
+                
+                if speaker not in self.voices:
+                    print(f"Warning: Unknown speaker '{speaker}', skipping...")
+                    continue
+                
+                voice_info = self.voices[speaker]
+                print(f"\nSegment {i+1}/{len(script)} - {voice_info['name']}:")
+                print(f"  Text: {line[:80]}{'...' if len(line) > 80 else ''}")
+                
+                # Generate audio file
+                output_path = os.path.join(output_dir, f"{i+1:03d}_{speaker}_{voice_info['name']}.mp3")
+                future = executor.submit(self.text_to_speech, line, voice_info, output_path)
+                jobs.append((speaker, future))
             
-            # Small delay to avoid overwhelming the API
-            time.sleep(0.5)
+            # Wait for the segments in script order
+            for speaker, future in jobs:
+                if not future.result():
+                    print(f"Failed to generate audio for {speaker}")
+                    executor.shutdown(cancel_futures=True)
+                    return False
+        
+        if self.use_cache:
+            tts_cache.trim_cache(self.cache_max_bytes, "gtts")
         
         print("\n" + "=" * 50)
         print("Podcast generation completed successfully!")
@@ -157,6 +187,34 @@ Examples:
         help="Output directory for audio segments (default: podcast_segments)"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Number of concurrent text-to-speech requests (default: 8)"
+    )
+    
+    parser.add_argument(
+        "--rps",
+        type=float,
+        default=10,
+        help="Maximum gTTS HTTP requests per second across all workers; lines over "
+             "100 characters take several requests (default: 10)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call gTTS instead of reusing cached audio"
+    )
+    
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=500,
+        help="Size budget for the speech cache in megabytes (default: 500)"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -166,7 +224,12 @@ Examples:
     args = parser.parse_args()
     
     try:
-        generator = SimplePodcastGenerator()
+        generator = SimplePodcastGenerator(
+            max_workers=args.workers,
+            use_cache=not args.no_cache,
+            cache_max_mb=args.cache_max_mb,
+            requests_per_second=args.rps
+        )
         
         success = generator.generate_podcast_segments(
             script_path=args.script_file,
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Podcast script loading shared by the generation scripts
+
+A script is a JSON array of dialogue entries such as
+``{"speaker": "MIGUEL", "line": "..."}``.
+"""
+
+import itertools
+
+# orjson parses large scripts considerably faster; fall back to the standard library
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# ijson parses the script incrementally so synthesis can start before the
+# whole file is read; without it the script is loaded in one go
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def load_script(script_path):
+    """
+    Load the podcast script from JSON file.
+    
+    Args:
+        script_path (str): Path to the JSON script file
+        
+    Returns:
+        list: List of dialogue entries
+    """
+    try:
+        with open(script_path, 'rb') as f:
+            script = json_loads(f.read())
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Script file not found: {script_path}")
+    except ValueError as e:
+        # json and orjson decode errors both derive from ValueError
+        raise ValueError(f"Invalid JSON format in script file: {script_path}") from e
+    
+    if not isinstance(script, list):
+        raise ValueError(f"Script file must contain a JSON array of dialogue entries: {script_path}")
+    return script
+
+
+def iter_script(script_path):
+    """
+    Yield the dialogue entries of a JSON script file as they are parsed.
+    
+    Args:
+        script_path (str): Path to the JSON script file
+        
+    Yields:
+        dict: Dialogue entries in script order
+    """
+    if ijson is None:
+        yield from load_script(script_path)
+        return
+    
+    try:
+        with open(script_path, 'rb') as f:
+            # Peek at the first event; items() silently yields nothing for
+            # anything but a top-level array
+            events = ijson.parse(f)
+            first = next(events, None)
+            is_array = first is not None and first[1] == 'start_array'
+            if is_array:
+                yield from ijson.items(itertools.chain([first], events), 'item')
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Script file not found: {script_path}")
+    except (ValueError, ijson.JSONError) as e:
+        # ijson's errors do not derive from ValueError
+        raise ValueError(f"Invalid JSON format in script file: {script_path}") from e
+    
+    if not is_array:
+        raise ValueError(f"Script file must contain a JSON array of dialogue entries: {script_path}")
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Segment file helpers shared by the podcast combining scripts
+
+The generators write one numbered file per dialogue segment; these helpers
+find them in playback order and check for the ffmpeg binary that joins them.
+"""
+
+import os
+import subprocess
+
+
+def segment_sort_key(path):
+    """
+    Sort key that orders segment files by their numeric prefix.
+    
+    Segment files are named like ``001_MIGUEL_Miguel.wav``; comparing the
+    prefix as an integer keeps ``10_...`` after ``9_...`` even without zero
+    padding. Files without a numeric prefix sort after numbered ones by name.
+    
+    Args:
+        path (str): Path to a segment file
+        
+    Returns:
+        tuple: Sort key
+    """
+    name = os.path.basename(path)
+    prefix = name.split('_', 1)[0]
+    if prefix.isdigit():
+        return (0, int(prefix), name)
+    return (1, 0, name)
+
+
+def list_segments(directory, extension):
+    """
+    List the segment files in a directory in playback order.
+    
+    Args:
+        directory (str): Directory containing the segments
+        extension (str): File extension to match, e.g. ".wav"
+        
+    Returns:
+        list: Sorted segment file paths
+    """
+    with os.scandir(directory) as entries:
+        files = [
+            entry.path for entry in entries
+            if entry.name.endswith(extension) and entry.is_file()
+        ]
+    files.sort(key=segment_sort_key)
+    return files
+
+
+def check_ffmpeg():
+    """Check if ffmpeg is available on the system."""
+    try:
+        result = subprocess.run(['ffmpeg', '-version'], capture_output=True, text=True)
+        return result.returncode == 0
+    except FileNotFoundError:
+        return False
@@ -7,51 +7,333 @@ transcription to a text file.
 """
 
 import argparse
+import asyncio
+import functools
 import os
 import sys
 from pathlib import Path
+import numpy as np
+import torch
 import whisper
+import file_cache
 
 
-def transcribe_audio(audio_path, output_path=None, model_name="base"):
+# model.transcribe's defaults for treating a window as silence
+NO_SPEECH_THRESHOLD = 0.6
+LOGPROB_THRESHOLD = -1.0
+
+# Decoded audio is cached here so later runs, with any model size, skip ffmpeg
+AUDIO_CACHE_DIR = file_cache.CACHE_ROOT / "audio"
+
+
+@functools.lru_cache(maxsize=4)
+def _load_model(model_name):
+    """Load a Whisper model once per process and reuse it for later files."""
+    print(f"Loading Whisper model: {model_name}")
+    return whisper.load_model(model_name)
+
+
+def _default_output_path(audio_path):
+    """Place the transcript next to the audio file with a .txt extension."""
+    return Path(audio_path).with_suffix('.txt')
+
+
+def _audio_cache_path(audio_path):
+    """Cache file for an audio file, keyed by its location, size and modification time."""
+    stat = os.stat(audio_path)
+    request_key = f"{os.path.abspath(audio_path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return file_cache.cache_path_for(AUDIO_CACHE_DIR, "whisper16k", request_key, ".npy")
+
+
+def _store_in_cache(samples, cache_path):
+    """Save samples into the cache."""
+    def write(fd, temp_path):
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, samples)
+    
+    file_cache.replace_atomically(cache_path, write)
+
+
+def load_audio(audio_path, use_cache=True, cache_max_mb=1000):
     """
-    Transcribe an audio file using Whisper and save to text file.
+    Decode an audio file to the 16 kHz mono samples Whisper expects.
+    
+    ffmpeg produces 16-bit samples, so they are cached as int16, which is
+    lossless and half the size of the float32 array. The cache holds the
+    waveform rather than the mel spectrogram because every model size
+    computes its own mel from it.
     
     Args:
         audio_path (str): Path to the audio file
-        output_path (str): Path for the output text file (optional)
-        model_name (str): Whisper model to use (tiny, base, small, medium, large)
+        use_cache (bool): Whether to reuse audio decoded by an earlier run
+        cache_max_mb (int): Size budget for the audio cache in megabytes
     
     Returns:
-        str: Path to the output text file
+        numpy.ndarray: Float32 samples
     """
     # Validate input file
     if not os.path.exists(audio_path):
         raise FileNotFoundError(f"Audio file not found: {audio_path}")
     
-    # Set output path if not provided
-    if output_path is None:
-        audio_file = Path(audio_path)
-        output_path = audio_file.with_suffix('.txt')
+    if not use_cache:
+        return whisper.load_audio(audio_path)
     
-    print(f"Loading Whisper model: {model_name}")
-    model = whisper.load_model(model_name)
+    cache_path = _audio_cache_path(audio_path)
+    if cache_path.exists():
+        try:
+            samples = np.load(cache_path, mmap_mode='r')
+            file_cache.touch_hit(cache_path)
+            return samples.astype(np.float32) / 32768.0
+        except (OSError, ValueError):
+            pass  # Unreadable entry; decode again and replace it
     
-    print(f"Transcribing audio file: {audio_path}")
-    result = model.transcribe(audio_path)
+    audio = whisper.load_audio(audio_path)
+    _store_in_cache(np.round(audio * 32768.0).astype(np.int16), cache_path)
+    file_cache.trim_cache(AUDIO_CACHE_DIR, cache_max_mb * 1024 * 1024)
+    return audio
+
+
+def split_windows(audio, search_seconds=5):
+    """
+    Split audio into windows of at most 30 s, cutting where it is quietest.
+    
+    Each cut is placed in the middle of the lowest-energy 100 ms frame within
+    the last few seconds of the window, so words are rarely split in two.
+    
+    Args:
+        audio (numpy.ndarray): 16 kHz samples
+        search_seconds (int): How far back from the 30 s limit to look for a pause
+    
+    Returns:
+        list: Windows in playback order
+    """
+    window = whisper.audio.N_SAMPLES
+    frame = whisper.audio.SAMPLE_RATE // 10
+    search = search_seconds * whisper.audio.SAMPLE_RATE
+    
+    windows = []
+    start = 0
+    while len(audio) - start > window:
+        search_start = start + window - search
+        energy = np.square(audio[search_start:start + window]).reshape(-1, frame).sum(axis=1)
+        end = search_start + int(np.argmin(energy)) * frame + frame // 2
+        windows.append(audio[start:end])
+        start = end
+    windows.append(audio[start:])
+    return windows
+
+
+def decode_batched(model, audio, batch_size):
+    """
+    Decode 30 s windows in batches instead of one after another.
+    
+    Windows are decoded independently and greedily, without timestamps, so
+    several of them can share each encoder and decoder pass.
+    
+    Args:
+        model: Loaded Whisper model
+        audio (numpy.ndarray): Samples from load_audio
+        batch_size (int): Number of windows per forward pass
+    
+    Returns:
+        str: Transcription text
+    """
+    windows = split_windows(audio)
+    options = whisper.DecodingOptions(
+        temperature=0.0,
+        without_timestamps=True,
+        fp16=torch.cuda.is_available()
+    )
+    
+    texts = []
+    for start in range(0, len(windows), batch_size):
+        mel_batch = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(window), model.dims.n_mels)
+            for window in windows[start:start + batch_size]
+        ]).to(model.device)
+        for result in whisper.decode(model, mel_batch, options):
+            # Drop windows Whisper itself would skip as silence, so pauses and
+            # intros don't turn into hallucinated text
+            if (result.no_speech_prob > NO_SPEECH_THRESHOLD
+                    and result.avg_logprob <= LOGPROB_THRESHOLD):
+                continue
+            texts.append(result.text)
+    
+    return " ".join(text for text in texts if text)
+
+
+def decode_audio(model, audio, accurate=False, batch_size=1):
+    """
+    Run Whisper on decoded samples and return the transcript text.
+    
+    Args:
+        model: Loaded Whisper model
+        audio (numpy.ndarray): Samples from load_audio
+        accurate (bool): Use Whisper's slower default decoding instead of
+            independent greedy decoding of each window
+        batch_size (int): Decode this many 30 s windows per forward pass;
+            1 keeps Whisper's sequential transcription
+    
+    Returns:
+        str: Transcription text
+    """
+    if batch_size > 1 and not accurate:
+        return decode_batched(model, audio, batch_size)
+    
+    if accurate:
+        decode_options = {}
+    else:
+        # Only the final text is kept, so decode each 30 s window greedily and
+        # independently: no prompt from the previous window, no temperature
+        # fallback retries and no word-level timestamp alignment
+        decode_options = {
+            "condition_on_previous_text": False,
+            "temperature": 0.0,
+            "word_timestamps": False
+        }
+    result = model.transcribe(audio, fp16=torch.cuda.is_available(), **decode_options)
+    
+    if result.get("segments"):
+        return "".join(segment["text"] for segment in result["segments"])
     
-    # Save transcription to text file
     transcription_text = result["text"]
     if isinstance(transcription_text, list):
         transcription_text = " ".join(transcription_text)
+    return transcription_text
+
+
+def write_transcript(transcription_text, output_path):
+    """
+    Save a transcription to a text file.
     
-    with open(output_path, 'w', encoding='utf-8') as f:
+    Args:
+        transcription_text (str): Text to save
+        output_path (str): Path for the output text file
+    """
+    # Write to a temporary file first so an interrupted run never leaves a
+    # truncated transcript behind
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
         f.write(transcription_text)
+    os.replace(temp_path, output_path)
     
     print(f"Transcription saved to: {output_path}")
+
+
+def transcribe_audio(audio_path, output_path=None, model_name="base", accurate=False,
+                     use_cache=True, batch_size=1):
+    """
+    Transcribe an audio file using Whisper and save to text file.
+    
+    Args:
+        audio_path (str): Path to the audio file
+        output_path (str): Path for the output text file (optional)
+        model_name (str): Whisper model to use (tiny, base, small, medium, large)
+        accurate (bool): Use Whisper's slower default decoding instead of
+            independent greedy decoding of each window
+        use_cache (bool): Whether to reuse audio decoded by an earlier run
+        batch_size (int): Decode this many 30 s windows per forward pass
+    
+    Returns:
+        str: Path to the output text file
+    """
+    audio = load_audio(audio_path, use_cache)
+    
+    # Set output path if not provided
+    if output_path is None:
+        output_path = _default_output_path(audio_path)
+    
+    model = _load_model(model_name)
+    
+    print(f"Transcribing audio file: {audio_path}")
+    transcription_text = decode_audio(model, audio, accurate, batch_size)
+    
+    # Save transcription to text file
+    write_transcript(transcription_text, output_path)
     return output_path
 
 
+async def _load_stage(audio_paths, loaded, use_cache, cache_max_mb):
+    """Decode each input in a worker thread and hand it to the model stage."""
+    for audio_path in audio_paths:
+        try:
+            audio = await asyncio.to_thread(load_audio, audio_path, use_cache, cache_max_mb)
+        except Exception as e:
+            # Pass the failure down the pipeline so earlier files are still written
+            await loaded.put((audio_path, None, e))
+            return
+        await loaded.put((audio_path, audio, None))
+    await loaded.put(None)
+
+
+async def _infer_stage(model_name, loaded, decoded, accurate, batch_size):
+    """Transcribe decoded inputs one at a time and hand the text to the writer."""
+    # The first file is already being decoded while the model loads
+    model = await asyncio.to_thread(_load_model, model_name)
+    
+    while (item := await loaded.get()) is not None:
+        audio_path, audio, error = item
+        transcription_text = None
+        if error is None:
+            print(f"Transcribing audio file: {audio_path}")
+            try:
+                transcription_text = await asyncio.to_thread(
+                    decode_audio, model, audio, accurate, batch_size
+                )
+            except Exception as e:
+                error = e
+        await decoded.put((audio_path, transcription_text, error))
+        if error is not None:
+            return
+    await decoded.put(None)
+
+
+async def _write_stage(decoded, output_path, on_written):
+    """Save finished transcripts without holding up the model stage."""
+    while (item := await decoded.get()) is not None:
+        audio_path, transcription_text, error = item
+        if error is not None:
+            # Everything ahead of the failed file has been written by now
+            raise error
+        target = output_path or _default_output_path(audio_path)
+        await asyncio.to_thread(write_transcript, transcription_text, target)
+        if on_written is not None:
+            on_written(audio_path, target)
+
+
+async def transcribe_files(audio_paths, output_path=None, model_name="base", accurate=False,
+                           on_written=None, use_cache=True, cache_max_mb=1000, batch_size=1):
+    """
+    Transcribe several audio files, overlapping decoding, inference and writing.
+    
+    While the model works on one file, the next file is decoded by ffmpeg and
+    the previous transcript is written out. The queues between the stages
+    hold at most two items, so decoded audio never piles up in memory.
+    
+    Args:
+        audio_paths (list): Paths to the audio files, transcribed in order
+        output_path (str): Output text file path; only for a single file
+        model_name (str): Whisper model to use (tiny, base, small, medium, large)
+        accurate (bool): Use Whisper's slower default decoding
+        on_written (callable): Called with (audio_path, output_path) after
+            each transcript is saved
+        use_cache (bool): Whether to reuse audio decoded by an earlier run
+        cache_max_mb (int): Size budget for the audio cache in megabytes
+        batch_size (int): Decode this many 30 s windows per forward pass
+    """
+    loaded = asyncio.Queue(maxsize=2)
+    decoded = asyncio.Queue(maxsize=2)
+    
+    # A failing file travels down the queues behind the files before it, so
+    # those are still written before the error propagates and asyncio.run
+    # cancels the remaining stages
+    await asyncio.gather(
+        _load_stage(audio_paths, loaded, use_cache, cache_max_mb),
+        _infer_stage(model_name, loaded, decoded, accurate, batch_size),
+        _write_stage(decoded, output_path, on_written)
+    )
+
+
 def main():
     """Main function to handle command line arguments and run transcription."""
     parser = argparse.ArgumentParser(
@@ -62,17 +344,20 @@ Examples:
   python transcribe_audio.py audio.mp3
   python transcribe_audio.py audio.wav -o transcription.txt
   python transcribe_audio.py audio.m4a -m large
+  python transcribe_audio.py part1.mp3 part2.mp3 part3.mp3
         """
     )
     
     parser.add_argument(
         "audio_file",
-        help="Path to the audio file to transcribe"
+        nargs="+",
+        help="Path to the audio file(s) to transcribe"
     )
     
     parser.add_argument(
         "-o", "--output",
-        help="Output text file path (default: same name as audio file with .txt extension)"
+        help="Output text file path (default: same name as audio file with .txt extension; "
+             "only valid with a single audio file)"
     )
     
     parser.add_argument(
@@ -82,6 +367,34 @@ Examples:
         help="Whisper model to use (default: base)"
     )
     
+    parser.add_argument(
+        "--accurate",
+        action="store_true",
+        help="Use Whisper's default decoding (conditions on previous text and retries "
+             "at higher temperatures; slower)"
+    )
+    
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Decode N 30-second windows per forward pass; much faster for long files "
+             "on a GPU (default: 1, Whisper's sequential transcription)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always decode the audio with ffmpeg instead of reusing decoded audio"
+    )
+    
+    parser.add_argument(
+        "--cache-max-mb",
+        type=int,
+        default=1000,
+        help="Size budget for the decoded audio cache in megabytes (default: 1000)"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -90,18 +403,37 @@ Examples:
     
     args = parser.parse_args()
     
-    try:
-        output_file = transcribe_audio(
-            audio_path=args.audio_file,
-            output_path=args.output,
-            model_name=args.model
-        )
-        
+    if args.output and len(args.audio_file) > 1:
+        parser.error("--output can only be used with a single audio file")
+    
+    if args.batch_size > 1 and args.accurate:
+        parser.error("--accurate decodes windows in sequence and cannot be combined with --batch-size")
+    
+    # Check every input before loading the model, which may first have to be downloaded
+    for audio_file in args.audio_file:
+        if not os.path.exists(audio_file):
+            print(f"Error: Audio file not found: {audio_file}", file=sys.stderr)
+            sys.exit(1)
+    
+    def report(audio_file, output_file):
         if args.verbose:
             print(f"\nTranscription completed successfully!")
-            print(f"Input: {args.audio_file}")
+            print(f"Input: {audio_file}")
             print(f"Output: {output_file}")
             print(f"Model used: {args.model}")
+    
+    try:
+        # The model is loaded once and shared by every file
+        asyncio.run(transcribe_files(
+            audio_paths=args.audio_file,
+            output_path=args.output,
+            model_name=args.model,
+            accurate=args.accurate,
+            on_written=report,
+            use_cache=not args.no_cache,
+            cache_max_mb=args.cache_max_mb,
+            batch_size=args.batch_size
+        ))
         
     except FileNotFoundError as e:
         print(f"Error: {e}", file=sys.stderr)
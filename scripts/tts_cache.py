@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Shared helpers for the podcast generation scripts
+
+The speech cache, request pacing and pooled HTTP session used by the
+ElevenLabs, Coqui and gTTS generators live here so every script behaves the
+same way.
+"""
+
+import contextlib
+import os
+import shutil
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+import file_cache
+from file_cache import touch_hit
+
+
+# Synthesized segments are cached here, keyed by a hash of the request
+TTS_CACHE_DIR = file_cache.CACHE_ROOT / "tts"
+
+
+def cache_path_for(prefix, request_key, extension):
+    """
+    Cache location for a synthesis request.
+    
+    Identical requests produce identical audio, so the key must cover
+    everything that affects the output (engine, voice, settings and text).
+    
+    Args:
+        prefix (str): Engine name, e.g. "gtts"
+        request_key (str): Description of the request
+        extension (str): File extension including the dot
+    
+    Returns:
+        Path: Cache file for this request
+    """
+    return file_cache.cache_path_for(TTS_CACHE_DIR, prefix, request_key, extension)
+
+
+def discard(path):
+    """
+    Remove a file if it exists.
+    
+    Outputs may be hard links into the cache, so they are removed before new
+    audio is written rather than overwritten in place, which would also
+    change the cached copy.
+    """
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def link_or_copy(source, destination):
+    """
+    Put a cached file at the destination without copying its bytes if possible.
+    
+    A hard link shares the cached file's data; copying is only needed when
+    the destination is on another filesystem or links are unsupported. The
+    cache entry counts as used either way.
+    
+    Args:
+        source (Path): Cached file
+        destination (str): Path the audio is expected at
+    """
+    # os.link refuses to replace an existing file
+    discard(destination)
+    
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+    touch_hit(source)
+
+
+def store_bytes(audio_data, cache_path):
+    """Write synthesized audio held in memory into the cache."""
+    def write(fd, temp_path):
+        with os.fdopen(fd, 'wb') as f:
+            f.write(audio_data)
+    
+    file_cache.replace_atomically(cache_path, write)
+
+
+def store_file(audio_path, cache_path):
+    """Copy a synthesized file into the cache."""
+    def write(fd, temp_path):
+        os.close(fd)
+        shutil.copyfile(audio_path, temp_path)
+    
+    file_cache.replace_atomically(cache_path, write)
+
+
+def trim_cache(max_bytes, prefix):
+    """
+    Delete one engine's least recently used cache files until they fit the budget.
+    
+    Each engine has its own budget, so cheap gTTS clips never push out
+    costly Coqui renders.
+    
+    Args:
+        max_bytes (int): Maximum total size of this engine's cache files
+        prefix (str): Engine name the files were cached under, e.g. "gtts"
+    """
+    file_cache.trim_cache(TTS_CACHE_DIR, max_bytes, prefix)
+
+
+class RateLimiter:
+    """Space calls at least ``1 / rps`` seconds apart across all threads."""
+    
+    def __init__(self, rps):
+        self._min_interval = 1.0 / rps
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def acquire(self):
+        """Block until the caller may make its next request."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + self._min_interval
+        
+        # Sleep outside the lock so other threads can reserve later slots
+        if wait > 0:
+            time.sleep(wait)
+
+
+class PacedSession(requests.Session):
+    """Session that waits for a rate limiter before every request it sends."""
+    
+    def __init__(self, limiter=None):
+        super().__init__()
+        self.limiter = limiter
+    
+    def send(self, request, **kwargs):
+        # gTTS splits long text into several requests, so pace each one
+        if self.limiter is not None:
+            self.limiter.acquire()
+        return super().send(request, **kwargs)
+
+
+class SharedSessionRequests:
+    """
+    Stand-in for the ``requests`` module inside gTTS that reuses one session.
+    
+    gTTS opens ``with requests.Session() as s`` for every request, paying a
+    fresh TCP and TLS handshake each time. Handing it a session that is not
+    closed on exit keeps the connections alive across segments.
+    """
+    
+    def __init__(self, session):
+        self._session = session
+    
+    def Session(self):
+        return contextlib.nullcontext(self._session)
+    
+    def __getattr__(self, name):
+        return getattr(requests, name)
+
+
+def share_gtts_session(max_workers, requests_per_second=None):
+    """
+    Route every gTTS request through one pooled, optionally paced HTTPS session.
+    
+    Args:
+        max_workers (int): Number of threads that call gTTS at once
+        requests_per_second (float): Ceiling on HTTP requests per second
+            across all threads, or None for no limit
+    
+    Returns:
+        requests.Session: The shared session
+    """
+    # Imported here so the other generators don't need gTTS installed
+    import gtts.tts
+    
+    limiter = RateLimiter(requests_per_second) if requests_per_second else None
+    session = PacedSession(limiter)
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=max(8, max_workers))
+    session.mount("https://", adapter)
+    gtts.tts.requests = SharedSessionRequests(session)
+    return session
+